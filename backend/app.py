@@ -1,26 +1,69 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Blueprint, request, jsonify
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
 from dotenv import load_dotenv
 
 import database as db
 from conversation_engine import DementiaCompanion
-from murf_service import generate_speech
-from deepgram_service import transcribe_audio
+import speech_backends
+from audio_service import preprocess_audio, MAX_AUDIO_BYTES
+import retention_service
+import memory_vector_service
 
 load_dotenv()
 required_keys = ['FLASK_SECRET_KEY', 'DEEPGRAM_API_KEY', 'MURF_API_KEY', 'GOOGLE_API_KEY']
+if speech_backends.SPEECH_OFFLINE:
+    # Deepgram and Murf are never called; speech runs on the local backends
+    required_keys = [k for k in required_keys if k not in ('DEEPGRAM_API_KEY', 'MURF_API_KEY')]
 missing = [k for k in required_keys if not os.getenv(k)]
 if missing:
     raise EnvironmentError(f"Missing API keys: {missing}")
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY')
-CORS(app)
+api = Blueprint('api', __name__)
 
-db.init_database()
+def create_app(preload=False):
+    """
+    Builds the Flask app. With preload=True (gunicorn master, see gunicorn.conf.py)
+    only the shared one-time setup runs here; each worker finishes with worker_ready().
+    """
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.getenv('FLASK_SECRET_KEY')
+    app.config['MAX_CONTENT_LENGTH'] = MAX_AUDIO_BYTES
+    CORS(app)
+    app.register_blueprint(api)
 
-@app.route('/api/chat', methods=['POST'])
+    # Safe to call from several processes: guarded by a file lock
+    db.init_database()
+    # Like the embedding model, the Vosk model is loaded once (in the gunicorn
+    # master when preloading) and shared copy-on-write by the forked workers
+    speech_backends.warm_up()
+
+    if not preload:
+        worker_ready()
+    return app
+
+def worker_ready():
+    """Per-process warm-up; runs before the process accepts any request."""
+    memory_vector_service.warm_up()
+    retention_service.start_retention_worker()
+
+@api.route('/healthz', methods=['GET'])
+def healthz():
+    return jsonify({'status': 'ok'})
+
+@api.route('/readyz', methods=['GET'])
+def readyz():
+    try:
+        conn = db.get_db_connection()
+        conn.execute("SELECT 1").fetchone()
+        conn.close()
+    except Exception as e:
+        return jsonify({'status': 'database unavailable', 'error': str(e)}), 503
+    # Speech backends only degrade the response (down to text-only), never readiness
+    return jsonify({'status': 'ready', 'speech': speech_backends.backend_status()})
+
+@api.route('/api/chat', methods=['POST'])
 def chat():
     try:
         user_text = None
@@ -35,18 +78,24 @@ def chat():
         # 2. Check for Audio Input ]
         elif 'audio' in request.files:
             audio_file = request.files['audio']
-            audio_data = audio_file.read()
-            # Transcribe
-            user_text = transcribe_audio(audio_data) # 
+            # Werkzeug spools large uploads to disk; stream it instead of reading into memory
+            audio_stream, content_type = preprocess_audio(audio_file.stream, audio_file.mimetype or 'audio/webm')
+            try:
+                # Transcribe (silence-only clips skip the STT call entirely)
+                user_text = speech_backends.transcribe(audio_stream, content_type) if audio_stream else None
+            finally:
+                if audio_stream is not None and audio_stream is not audio_file.stream:
+                    audio_stream.close()
             
             if user_text is None:
                 # Handle transcription failure
                 response_text = "I didn't catch that clearly. Could you say it again?"
-                audio_base64 = generate_speech(response_text)
+                audio_base64, audio_format = speech_backends.synthesize(response_text)
                 return jsonify({
                     'transcript': "",
                     'response': response_text,
-                    'audio': audio_base64
+                    'audio': audio_base64,
+                    'audio_format': audio_format
                 })
         
         else:
@@ -65,20 +114,24 @@ def chat():
         # Save to DB 
         db.save_conversation(patient_id, user_text, response_text)
         
-        # Generate Audio response 
-        audio_base64 = generate_speech(response_text)
+        # Generate Audio response (None if no voice is available: text-only reply)
+        audio_base64, audio_format = speech_backends.synthesize(response_text)
         
         return jsonify({
             'transcript': user_text,
             'response': response_text, 
-            'audio': audio_base64      
+            'audio': audio_base64,
+            'audio_format': audio_format
         })
     
+    except RequestEntityTooLarge:
+        return jsonify({'error': 'Audio recording is too large'}), 413
+
     except Exception as e:
         print(f"Error in chat endpoint: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/tasks', methods=['GET'])
+@api.route('/api/tasks', methods=['GET'])
 def get_tasks():
     try:
         patient_id = db.get_patient_id()
@@ -87,7 +140,7 @@ def get_tasks():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/notes', methods=['GET'])
+@api.route('/api/notes', methods=['GET'])
 def get_notes():
     try:
         patient_id = db.get_patient_id()
@@ -96,7 +149,7 @@ def get_notes():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/caregiver-alert', methods=['GET'])
+@api.route('/api/caregiver-alert', methods=['GET'])
 def caregiver_alert():
     try:
         patient_id = db.get_patient_id()
@@ -111,7 +164,7 @@ def caregiver_alert():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/history', methods=['GET'])
+@api.route('/api/history', methods=['GET'])
 def get_history():
     try:
         patient_id = db.get_patient_id()
@@ -120,7 +173,19 @@ def get_history():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/record-call', methods=['POST'])
+@api.route('/api/history/archive', methods=['GET'])
+def get_history_archive():
+    try:
+        patient_id = db.get_patient_id()
+        month = request.args.get('month')
+        # Without a month, list the monthly summaries; with one, return its turns
+        if month:
+            return jsonify(db.get_archived_conversations(patient_id, month))
+        return jsonify(db.get_archive_summaries(patient_id))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api.route('/api/record-call', methods=['POST'])
 def record_call():
     try:
         data = request.json
@@ -136,7 +201,7 @@ def record_call():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
     
-@app.route('/api/tasks/<int:task_id>', methods=['PUT'])
+@api.route('/api/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
     try:
         data = request.json
@@ -153,4 +218,5 @@ def update_task(task_id):
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(debug=False, host='0.0.0.0', port=5000)
+    # Development server; use `gunicorn -c gunicorn.conf.py` in production
+    create_app().run(debug=False, host='0.0.0.0', port=5000)
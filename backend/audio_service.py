@@ -0,0 +1,172 @@
+import os
+import shutil
+import time
+import struct
+import tempfile
+import threading
+import subprocess
+import concurrent.futures
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Hard limit on the raw upload (enforced by Flask via MAX_CONTENT_LENGTH)
+MAX_AUDIO_BYTES = int(os.getenv('MAX_AUDIO_BYTES', 10 * 1024 * 1024))
+# Longest utterance we forward to speech-to-text after trimming
+MAX_AUDIO_SECONDS = int(os.getenv('MAX_AUDIO_SECONDS', 60))
+AUDIO_WORKERS = int(os.getenv('AUDIO_WORKERS', 2))
+# Total time an upload may spend queued plus in ffmpeg before we send it unprocessed.
+# Keep it well below STT_LATENCY_BUDGET: it is spent before transcription starts.
+FFMPEG_TIMEOUT = float(os.getenv('FFMPEG_TIMEOUT', 3))
+# Trimmed clips shorter than this are treated as silence and never sent to STT
+MIN_SPEECH_SECONDS = 0.05
+
+TARGET_SAMPLE_RATE = 16000
+CHUNK_SIZE = 64 * 1024
+FFMPEG_PATH = shutil.which('ffmpeg')
+
+# Energy-based voice activity detection: drop leading silence, then collapse any
+# pause longer than 0.6s (including the trailing one) down to 0.2s.
+SILENCE_FILTER = (
+    "silenceremove="
+    "start_periods=1:start_threshold=-45dB:start_silence=0.1:"
+    "stop_periods=-1:stop_duration=0.6:stop_threshold=-45dB:stop_silence=0.2"
+)
+
+# ffmpeg is CPU bound, so run it in a small pool instead of on every request thread
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=AUDIO_WORKERS, thread_name_prefix='audio')
+
+
+def _run_ffmpeg(command, stream, output, timeout=FFMPEG_TIMEOUT):
+    """
+    Pipes `stream` through ffmpeg in chunks into the `output` file. The whole run,
+    including writing stdin, is bounded by `timeout`: a watchdog kills
+    ffmpeg, which unblocks a write to a process that stopped reading.
+    """
+    # stderr goes to a file too: a full stderr pipe would stall ffmpeg and then our writes
+    errors = tempfile.TemporaryFile()
+    process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=output, stderr=errors)
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.start()
+
+    try:
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                process.stdin.write(chunk)
+            process.stdin.close()
+        except (BrokenPipeError, ValueError):
+            # ffmpeg exited early (or was killed); the return code below tells us why
+            pass
+        process.wait()
+    finally:
+        watchdog.cancel()
+
+    if process.returncode != 0:
+        errors.seek(0)
+        message = errors.read(4096).decode(errors='replace').strip() or "timed out"
+        errors.close()
+        raise RuntimeError(f"ffmpeg failed: {message}")
+    errors.close()
+
+
+def _wav_duration(output):
+    """Seconds of 16-bit mono audio in a WAV file written to a pipe (its size fields are unset)."""
+    size = output.tell()
+    output.seek(0)
+    header = output.read(4096)
+
+    # Walk the RIFF chunks (fmt, LIST, ...) to the start of the sample data
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id, chunk_size = struct.unpack_from('<4sI', header, offset)
+        if chunk_id == b'data':
+            return max(0, size - offset - 8) / (2 * TARGET_SAMPLE_RATE)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return 0.0
+
+
+def _transcode(stream, deadline):
+    """
+    Streams the upload through ffmpeg and returns a temp file holding trimmed
+    16 kHz mono WAV audio, or None if only silence was left. The output is
+    uncompressed on purpose: encoding it again (e.g. to Opus) cost more time than
+    the smaller upload saved, and a second lossy pass can only hurt recognition.
+    """
+    timeout = deadline - time.monotonic()
+    if timeout <= 0:
+        raise TimeoutError("timed out waiting for an audio worker")
+
+    command = [
+        FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-af', SILENCE_FILTER,
+        '-t', str(MAX_AUDIO_SECONDS),
+        '-ar', str(TARGET_SAMPLE_RATE), '-ac', '1',
+        '-c:a', 'pcm_s16le', '-f', 'wav', 'pipe:1'
+    ]
+
+    # Output goes straight to disk so we never hold the whole clip in memory
+    output = tempfile.TemporaryFile()
+    try:
+        _run_ffmpeg(command, stream, output, timeout=timeout)
+    except Exception:
+        output.close()
+        raise
+
+    # silenceremove emits (almost) no samples when nothing crossed the threshold
+    if _wav_duration(output) < MIN_SPEECH_SECONDS:
+        output.close()
+        return None
+
+    output.seek(0)
+    return output
+
+
+def preprocess_audio(stream, content_type='audio/webm'):
+    """
+    Trims silence and resamples an uploaded recording before it is sent to STT.
+    Returns (file_obj, content_type); file_obj is None when the clip had no speech.
+    Falls back to the original upload if ffmpeg is missing, fails or takes longer
+    than FFMPEG_TIMEOUT (queue wait included).
+    """
+    if not FFMPEG_PATH:
+        return stream, content_type
+
+    deadline = time.monotonic() + FFMPEG_TIMEOUT
+    future = _executor.submit(_transcode, stream, deadline)
+    try:
+        try:
+            processed = future.result(timeout=FFMPEG_TIMEOUT)
+        except concurrent.futures.TimeoutError:
+            # Still queued behind other uploads: give up and send the raw upload
+            if future.cancel():
+                raise
+            # Already running: its watchdog fires at the same deadline
+            processed = future.result()
+
+        if processed is None:
+            return None, None
+        return processed, 'audio/wav'
+
+    except Exception as e:
+        print(f"Audio preprocessing error: {str(e) or type(e).__name__}")
+        stream.seek(0)
+        return stream, content_type
+
+
+def decode_to_pcm(stream, timeout=FFMPEG_TIMEOUT):
+    """
+    Decodes any recording to raw 16 kHz mono 16-bit PCM, the input format
+    offline recognizers expect. Requires ffmpeg.
+    """
+    command = [
+        FFMPEG_PATH, '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-t', str(MAX_AUDIO_SECONDS),
+        '-ar', str(TARGET_SAMPLE_RATE), '-ac', '1',
+        '-f', 's16le', 'pipe:1'
+    ]
+    with tempfile.TemporaryFile() as output:
+        _run_ffmpeg(command, stream, output, timeout=timeout)
+        output.seek(0)
+        return output.read()
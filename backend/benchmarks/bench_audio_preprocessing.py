@@ -0,0 +1,168 @@
+"""
+Compares raw vs preprocessed audio uploads against a local fake STT endpoint.
+
+Usage (from backend/):
+    python benchmarks/bench_audio_preprocessing.py [recordings_dir]
+
+Without a directory, a synthetic corpus of padded webm/opus clips is generated
+with ffmpeg. Reports bytes sent to STT, STT round-trip latency and peak RSS per
+request: the server process's growth over its idle baseline, and the ffmpeg child.
+"""
+import os
+import sys
+import glob
+import time
+import tempfile
+import threading
+import subprocess
+import resource
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Simulated STT processing cost per MB of audio received
+FAKE_STT_SECONDS_PER_MB = 0.5
+
+
+class FakeSTTHandler(BaseHTTPRequestHandler):
+    bytes_received = 0
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        remaining = length
+        while remaining > 0:
+            remaining -= len(self.rfile.read(min(remaining, 65536)))
+        FakeSTTHandler.bytes_received += length
+        time.sleep(length / (1024 * 1024) * FAKE_STT_SECONDS_PER_MB)
+
+        body = b'{"results": {"channels": [{"alternatives": [{"transcript": "hello kaya"}]}]}}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def build_corpus(directory):
+    """Speech-like tone bursts wrapped in silence, encoded like a browser MediaRecorder."""
+    clips = []
+    for lead, speech, tail in [(0.5, 2, 1.5), (2, 4, 3), (1, 8, 4), (3, 15, 5), (0.2, 30, 0.5)]:
+        path = os.path.join(directory, f"clip_{lead}_{speech}_{tail}.webm")
+        filter_graph = (
+            f"anullsrc=r=48000:cl=stereo:d={lead}[a];"
+            f"sine=frequency=220:sample_rate=48000:duration={speech},aformat=channel_layouts=stereo[b];"
+            f"anullsrc=r=48000:cl=stereo:d={tail}[c];"
+            "[a][b][c]concat=n=3:v=0:a=1"
+        )
+        subprocess.run(
+            ['ffmpeg', '-y', '-loglevel', 'error', '-filter_complex', filter_graph,
+             '-c:a', 'libopus', '-b:a', '128k', path],
+            check=True
+        )
+        clips.append(path)
+    return clips
+
+
+class ChildPeakSampler(threading.Thread):
+    """
+    Polls VmHWM of this process's children (ffmpeg). ru_maxrss for children is
+    no use here: on Linux it also counts the parent memory present at fork time.
+    """
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.peak_kb = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(0.005):
+            for children in glob.glob('/proc/self/task/*/children'):
+                for pid in open(children).read().split():
+                    try:
+                        with open(f'/proc/{pid}/status') as status:
+                            for line in status:
+                                if line.startswith('VmHWM:'):
+                                    self.peak_kb = max(self.peak_kb, int(line.split()[1]))
+                    except OSError:
+                        pass
+
+
+def _measure(path, preprocess):
+    """
+    Handles one upload in a fresh process, so peak RSS (ours and the ffmpeg
+    child's) belongs to this request alone.
+    """
+    import audio_service
+    from deepgram_service import transcribe_audio
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    sampler = ChildPeakSampler()
+    sampler.start()
+    with open(path, 'rb') as upload:
+        start = time.perf_counter()
+        if preprocess:
+            audio_stream, content_type = audio_service.preprocess_audio(upload)
+        else:
+            audio_stream, content_type = upload.read(), 'audio/webm'
+        prep_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if audio_stream is not None:
+            transcribe_audio(audio_stream, content_type)
+        latency = time.perf_counter() - start
+
+        if hasattr(audio_stream, 'close') and audio_stream is not upload:
+            audio_stream.close()
+
+    # ru_maxrss is in KB on Linux
+    rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+    sampler.stopped.set()
+    sampler.join()
+    return prep_time, latency, baseline, rss_growth, sampler.peak_kb
+
+
+def run(clips, preprocess):
+    rows = []
+    context = multiprocessing.get_context('spawn')
+    for path in clips:
+        FakeSTTHandler.bytes_received = 0
+        with context.Pool(1) as pool:
+            measured = pool.apply(_measure, (path, preprocess))
+        rows.append((os.path.basename(path), os.path.getsize(path), FakeSTTHandler.bytes_received) + measured)
+    return rows
+
+
+def main():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeSTTHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ['DEEPGRAM_URL'] = f"http://127.0.0.1:{server.server_address[1]}/v1/listen"
+    os.environ.setdefault('DEEPGRAM_API_KEY', 'benchmark')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if len(sys.argv) > 1:
+            clips = sorted(glob.glob(os.path.join(sys.argv[1], '*')))
+        else:
+            clips = build_corpus(tmp)
+
+        for label, preprocess in [('raw upload', False), ('preprocessed', True)]:
+            print(f"\n== {label}")
+            print(f"{'clip':<24}{'upload':>10}{'to STT':>10}{'prep':>9}{'STT':>9}"
+                  f"{'base RSS':>10}{'+RSS':>8}{'ffmpeg':>9}")
+            total_bytes = total_prep = total_latency = 0
+            for name, size, sent, prep_time, latency, baseline, growth, ffmpeg_rss in run(clips, preprocess):
+                total_bytes += sent
+                total_prep += prep_time
+                total_latency += latency
+                print(f"{name:<24}{size:>10,}{sent:>10,}{prep_time * 1000:>7.0f}ms{latency * 1000:>7.0f}ms"
+                      f"{baseline / 1024:>8.1f}MB{growth / 1024:>6.1f}MB{ffmpeg_rss / 1024:>7.1f}MB")
+            print(f"{'total':<24}{'':>10}{total_bytes:>10,}{total_prep * 1000:>7.0f}ms{total_latency * 1000:>7.0f}ms")
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Times /api/chat with the remote speech services disabled, unreachable or
+hanging, to check the local fallbacks and the text-only degradation.
+Gemini and Chroma are mocked (see mock_wsgi.py); nothing touches the network.
+
+Usage (from backend/):
+    python benchmarks/bench_offline_speech.py [requests]
+"""
+import io
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class HangingHandler(BaseHTTPRequestHandler):
+    """A remote service that accepts the request and never answers in time."""
+
+    def do_POST(self):
+        time.sleep(60)
+
+    def log_message(self, *args):
+        pass
+
+
+def _reset_health(speech_backends):
+    for backend in speech_backends.TTS_BACKENDS + speech_backends.STT_BACKENDS:
+        backend.record_success()
+
+
+def run(client, count):
+    rows = []
+    for kind in ('text', 'audio'):
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            if kind == 'text':
+                response = client.post('/api/chat', json={'message': 'How are you today?'})
+            else:
+                upload = (io.BytesIO(b'\x1aE\xdf\xa3' + b'\x00' * 4096), 'recording.webm', 'audio/webm')
+                response = client.post('/api/chat', data={'audio': upload}, content_type='multipart/form-data')
+            timings.append(time.perf_counter() - start)
+        body = response.get_json()
+        rows.append((kind, response.status_code, body.get('audio_format') or 'text-only',
+                     timings[0], statistics.median(timings)))
+    return rows
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    hanging = ThreadingHTTPServer(('127.0.0.1', 0), HangingHandler)
+    threading.Thread(target=hanging.serve_forever, daemon=True).start()
+    hanging_url = f"http://127.0.0.1:{hanging.server_address[1]}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['DATABASE_PATH'] = os.path.join(tmp, 'bench.db')
+        os.environ['MOCK_SPEECH'] = '0'
+        os.environ['MOCK_IO_MS'] = '0'
+        from benchmarks import mock_wsgi
+        import murf_service
+        import deepgram_service
+        import speech_backends
+
+        client = mock_wsgi.app.test_client()
+        print(f"local TTS: {speech_backends.EspeakTTS().available()}, local STT: {speech_backends.VoskSTT().available()}")
+
+        scenarios = [
+            ('offline', True, murf_service.MURF_URL, deepgram_service.DEEPGRAM_URL),
+            ('unreachable', False, 'http://127.0.0.1:9', 'http://127.0.0.1:9'),
+            ('hanging', False, hanging_url, hanging_url),
+        ]
+        print(f"{'scenario':<13}{'input':<7}{'status':>7}{'voice':>12}{'first':>10}{'median':>10}")
+        for name, offline, murf_url, deepgram_url in scenarios:
+            speech_backends.SPEECH_OFFLINE = offline
+            murf_service.MURF_URL = murf_url
+            deepgram_service.DEEPGRAM_URL = deepgram_url
+            _reset_health(speech_backends)
+
+            for kind, status, voice, first, median in run(client, count):
+                print(f"{name:<13}{kind:<7}{status:>7}{voice:>12}{first * 1000:>8.0f}ms{median * 1000:>8.0f}ms")
+
+    hanging.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Simulates years of usage and compares database size and query latency with
+and without the retention job.
+
+Usage (from backend/):
+    python benchmarks/bench_retention.py [years] [turns_per_day]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import database as db
+
+PHRASES = [
+    "Did I take my morning medicine?", "Who visited me today?", "What time is lunch?",
+    "Remember that my daughter called", "I feel a bit tired", "Add evening walk at 5 pm",
+    "What is my grandson's name?", "Tell me about my day", "Is it time for dinner?"
+]
+
+
+def populate(years, turns_per_day):
+    conn = db.get_db_connection()
+    start = datetime.utcnow() - timedelta(days=365 * years)
+    rows = []
+    for day in range(365 * years):
+        for turn in range(turns_per_day):
+            timestamp = start + timedelta(days=day, minutes=turn * 17)
+            rows.append((1, random.choice(PHRASES), "Of course, I'm here to help you with that.",
+                         timestamp.strftime('%Y-%m-%d %H:%M:%S')))
+        if day % 7 == 0:
+            conn.execute(
+                "INSERT INTO contact_calls (patient_id, caller_name, call_time) VALUES (1, 'Daughter', ?)",
+                ((start + timedelta(days=day)).strftime('%Y-%m-%d %H:%M:%S'),)
+            )
+    conn.executemany(
+        "INSERT INTO conversation_history (patient_id, user_message, agent_response, timestamp) VALUES (?, ?, ?, ?)",
+        rows
+    )
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def timed(fn, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def report(label):
+    conn = db.get_db_connection()
+    hot_rows = conn.execute("SELECT COUNT(*) FROM conversation_history").fetchone()[0]
+    conn.close()
+    size = os.path.getsize(db.DATABASE_PATH)
+    recent = timed(lambda: db.get_recent_conversations(1, limit=10))
+    count = timed(lambda: db.get_db_connection().execute(
+        "SELECT COUNT(*) FROM conversation_history WHERE patient_id = 1").fetchone(), repeat=20)
+    print(f"{label:<18}{size / 1024 / 1024:>10.2f}MB{hot_rows:>12,}{recent:>14.3f}ms{count:>14.3f}ms")
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    turns_per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DATABASE_PATH = os.path.join(tmp, 'bench.db')
+        db.init_database()
+        total = populate(years, turns_per_day)
+        print(f"Simulated {years} years, {total:,} turns")
+        print(f"{'':<18}{'db size':>12}{'hot rows':>12}{'recent(10)':>16}{'count(*)':>16}")
+        report('before retention')
+
+        import retention_service
+        retention_service.VECTOR_COMPACTION_ENABLED = False
+        retention_service.VACUUM_PAGES_PER_CYCLE = 10 ** 9
+
+        start = time.perf_counter()
+        stats = retention_service.run_retention_cycle()
+        elapsed = time.perf_counter() - start
+        report('after retention')
+        print(f"Retention cycle took {elapsed:.2f}s: {stats}")
+
+        summaries = db.get_archive_summaries(1)
+        month = summaries[len(summaries) // 2]['month']
+        lookup = timed(lambda: db.get_archived_conversations(1, month), repeat=20)
+        print(f"{len(summaries)} archived months; loading {month} on demand takes {lookup:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
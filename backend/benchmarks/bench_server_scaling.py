@@ -0,0 +1,104 @@
+"""
+Measures /api/chat requests/sec under gunicorn with 1..N workers, using the
+mocked services in mock_wsgi.py.
+
+Usage (from backend/):
+    python benchmarks/bench_server_scaling.py [max_workers] [seconds]
+"""
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import subprocess
+import urllib.request
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CLIENT_THREADS_PER_WORKER = 4
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base_url}/readyz", timeout=1) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+def _client(args):
+    base_url, threads, seconds = args
+    body = json.dumps({"message": "How are you today?"}).encode()
+
+    def loop():
+        done = 0
+        deadline = time.time() + seconds
+        while time.time() < deadline:
+            request = urllib.request.Request(
+                f"{base_url}/api/chat", data=body, headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+            done += 1
+        return done
+
+    with ThreadPoolExecutor(threads) as pool:
+        return sum(pool.map(lambda _: loop(), range(threads)))
+
+
+def measure(workers, seconds, tmp):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        WSGI_APP='benchmarks.mock_wsgi:app',
+        BIND=f"127.0.0.1:{port}",
+        DATABASE_PATH=os.path.join(tmp, f"bench_{workers}.db"),
+    )
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--log-level', 'warning'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        _wait_until_ready(base_url)
+        # Client load runs in separate processes so the GIL doesn't cap it
+        processes = max(1, min(workers, multiprocessing.cpu_count()))
+        threads = CLIENT_THREADS_PER_WORKER * workers // processes
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            total = sum(pool.map(_client, [(base_url, threads, seconds)] * processes))
+        return total / (time.perf_counter() - start)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+
+def main():
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else multiprocessing.cpu_count()
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    print(f"{'workers':>8}{'req/s':>10}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        baseline = None
+        for workers in range(1, max_workers + 1):
+            rps = measure(workers, seconds, tmp)
+            baseline = baseline or rps
+            print(f"{workers:>8}{rps:>10.1f}{rps / baseline:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Index size and recall on a repetitive synthetic corpus across merge
+thresholds, plus whether corrected facts ("Friday" -> "Monday") recall the
+newest value.
+
+Usage (from backend/):
+    python benchmarks/bench_vector_dedup.py [repeats]
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+# Each fact is mentioned many times in different words, as patients tend to do
+FACTS = [
+    ("Who visited me today?", ["My daughter came today", "Daughter visited today", "My daughter Priya visited me"]),
+    ("What is my grandson's name?", ["My grandson's name is Rahul", "Rahul is my grandson", "Grandson is called Rahul"]),
+    ("Where are my glasses?", ["My glasses are on the kitchen table", "I left my glasses in the kitchen", "Glasses are on the kitchen table"]),
+    ("When is my doctor appointment?", ["Doctor appointment is on Friday", "I see Dr. Sharma on Friday", "My appointment with the doctor is Friday"]),
+    ("What did I have for lunch?", ["I had rice and dal for lunch", "Lunch was rice and dal", "Ate dal and rice at lunch"]),
+    ("Who is my neighbour?", ["My neighbour is Mrs. Iyer", "Mrs. Iyer lives next door", "The lady next door is Mrs. Iyer"]),
+    ("Did I water the plants?", ["I watered the plants this morning", "Plants were watered today", "I gave water to the plants"]),
+    ("Where did I keep my keys?", ["The keys are in the blue bowl", "I put my keys in the blue bowl", "Keys are kept in the blue bowl by the door"]),
+    ("What is my son's phone number?", ["My son's number is 98450 12345", "Son's phone number is 98450 12345", "Call my son at 98450 12345"]),
+    ("What is my cat's name?", ["My cat is called Mittens", "The cat's name is Mittens", "Mittens is my cat"]),
+]
+
+# Facts that change: the later note must win at recall time
+CORRECTIONS = [
+    ("When is my dentist appointment?", "Dentist appointment is on Friday", "Dentist appointment is on Monday", "Monday"),
+    ("What is my daughter's phone number?", "My daughter's number is 98860 11111", "My daughter's number is 98860 22222", "22222"),
+    ("Where is my medicine box?", "The medicine box is in the bedroom drawer", "The medicine box is in the kitchen cupboard", "kitchen"),
+    ("What time is my walk?", "My evening walk is at 5 pm", "My evening walk is at 6 pm", "6 pm"),
+]
+
+
+def run(threshold, repeats):
+    import memory_vector_service
+
+    random.seed(7)
+    notes = [(fact_index, text) for _ in range(repeats) for fact_index, (_, texts) in enumerate(FACTS) for text in texts]
+    random.shuffle(notes)
+
+    labels = {}
+    wrong_merges = 0
+    start = time.perf_counter()
+    day = datetime(2025, 1, 1)
+    for i, (fact_index, text) in enumerate(notes):
+        metadata = {"patient_id": 1, "date": (day + timedelta(hours=i)).isoformat(), "type": "general_note"}
+        doc_id, merged = memory_vector_service.save_vector_memory(text, metadata, threshold=threshold)
+        if merged and labels[doc_id] != fact_index:
+            wrong_merges += 1
+        labels.setdefault(doc_id, fact_index)
+    ingest = time.perf_counter() - start
+
+    # Corrections arrive after everything else, old statement first
+    correction_start = day + timedelta(hours=len(notes))
+    for i, (_, old_text, new_text, _) in enumerate(CORRECTIONS):
+        for j, text in enumerate((old_text, new_text)):
+            metadata = {"patient_id": 1, "date": (correction_start + timedelta(days=i, hours=j)).isoformat(),
+                        "type": "general_note"}
+            memory_vector_service.save_vector_memory(text, metadata, threshold=threshold)
+
+    collection = memory_vector_service._get_collection()
+    size = collection.count()
+
+    # Recall: the right fact in the top-2 window, and how many distinct facts it holds
+    hits = distinct = 0
+    for fact_index, (question, _) in enumerate(FACTS):
+        results = collection.query(query_texts=[question], n_results=2)
+        found = [labels.get(doc_id) for doc_id in results['ids'][0]]
+        hits += fact_index in found
+        distinct += len(set(found))
+
+    # Corrections: the top hit must carry the newest value
+    current = 0
+    for question, _, _, new_value in CORRECTIONS:
+        top = collection.query(query_texts=[question], n_results=1)['documents'][0][0]
+        current += new_value in top
+
+    memory_vector_service.delete_patient_memories(1)
+    return (len(notes) + 2 * len(CORRECTIONS), size, ingest, hits / len(FACTS), distinct / len(FACTS),
+            wrong_merges, current / len(CORRECTIONS))
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['CHROMA_DATA_PATH'] = tmp
+        import memory_vector_service
+
+        print(f"{'threshold':<12}{'notes':>7}{'vectors':>9}{'ingest':>9}{'recall@2':>10}{'facts@2':>9}"
+              f"{'wrong merges':>14}{'newest wins':>13}")
+        thresholds = [1.01, memory_vector_service.DUPLICATE_SIMILARITY, 0.95, 0.9, 0.85, 0.8, 0.75]
+        for threshold in sorted(set(thresholds), reverse=True):
+            label = 'no merging' if threshold > 1 else f"{threshold:.2f}"
+            notes, size, ingest, recall, distinct, wrong, newest = run(threshold, repeats)
+            print(f"{label:<12}{notes:>7}{size:>9}{ingest:>8.2f}s{recall:>10.2f}{distinct:>9.2f}"
+                  f"{wrong:>14}{newest:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+WSGI entry point with the external services (Gemini, Murf, Deepgram, Chroma)
+replaced by fakes with fixed CPU and I/O costs. Used by bench_server_scaling.py
+and bench_offline_speech.py:
+
+    WSGI_APP=benchmarks.mock_wsgi:app gunicorn -c gunicorn.conf.py
+"""
+import os
+import sys
+import time
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+MOCK_CPU_MS = float(os.getenv('MOCK_CPU_MS', 5))
+MOCK_IO_MS = float(os.getenv('MOCK_IO_MS', 20))
+
+for key in ['FLASK_SECRET_KEY', 'DEEPGRAM_API_KEY', 'MURF_API_KEY', 'GOOGLE_API_KEY']:
+    os.environ.setdefault(key, 'benchmark')
+
+
+def _burn_cpu(ms):
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+def _remote_call(result):
+    def call(*args, **kwargs):
+        _burn_cpu(MOCK_CPU_MS)
+        time.sleep(MOCK_IO_MS / 1000)
+        return result
+    return call
+
+
+def _install(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+
+
+_install('llm_service',
+         get_ai_response=_remote_call({"intent": "chat", "response_text": "I'm here with you.", "parameters": {}}),
+         synthesize_memory_answer=_remote_call("I don't see a note about that."))
+# MOCK_SPEECH=0 keeps the real Murf/Deepgram clients (e.g. to test fallbacks)
+if os.getenv('MOCK_SPEECH', '1') == '1':
+    _install('murf_service', generate_speech=_remote_call("UklGRg=="))
+    _install('deepgram_service',
+             transcribe_audio=_remote_call("hello kaya"),
+             request_transcript=_remote_call("hello kaya"))
+_install('memory_vector_service',
+         warm_up=lambda: None,
+         save_vector_memory=_remote_call(('mock', False)),
+         search_similar_memories=_remote_call([]),
+         delete_patient_memories=_remote_call(True),
+         compact_patient_memories=lambda patient_id: {})
+
+from app import create_app  # noqa: E402
+
+app = create_app(preload=True)
@@ -118,18 +118,19 @@ class DementiaCompanion:
 
     def _handle_memory_save(self, user_speech, response_text, params):
         note_content = params.get("note_content") or user_speech
-        
-        # SQL Log
         reminder_time = params.get("due_datetime")
-        db.add_memory_note(self.patient_id, note_content, reminder_time)
         
-        # Vector Store
+        # Vector Store (near-duplicates merge into the existing vector)
         metadata = {
             "patient_id": self.patient_id,
             "date": datetime.now().isoformat(),
             "type": "general_note"
         }
-        memory_vector_service.save_vector_memory(note_content, metadata)
+        vector_id, merged = memory_vector_service.save_vector_memory(note_content, metadata)
+        
+        # SQL Log (kept in sync: a repeat updates the existing row instead of adding one)
+        if not merged or not db.touch_memory_note(self.patient_id, vector_id, note_content, reminder_time):
+            db.add_memory_note(self.patient_id, note_content, reminder_time, vector_id=vector_id)
         
         return response_text
 
@@ -1,17 +1,87 @@
 import sqlite3
 import os
+import json
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, date
 
-DATABASE_PATH = os.path.join(os.path.dirname(__file__), 'memory_companion.db')
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server only
+    fcntl = None
+
+DATABASE_PATH = os.getenv('DATABASE_PATH', os.path.join(os.path.dirname(__file__), 'memory_companion.db'))
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'schema.sql')
+
+# Schema changes for databases created by an older schema.sql, applied in order.
+# PRAGMA user_version records how many have run. New databases get the current
+# schema.sql and are stamped with the latest version directly.
+MIGRATIONS = [
+    # Incremental auto-vacuum lets the retention job hand freed pages back to the OS
+    "PRAGMA auto_vacuum = INCREMENTAL; VACUUM;",
+    # Link notes to their vector so near-duplicates merge into one row
+    """ALTER TABLE memory_notes ADD COLUMN vector_id TEXT;
+       ALTER TABLE memory_notes ADD COLUMN seen_count INTEGER DEFAULT 1;
+       ALTER TABLE memory_notes ADD COLUMN last_seen_at TIMESTAMP;""",
+]
 
 def get_db_connection():
     conn = sqlite3.connect(DATABASE_PATH)
     conn.row_factory = sqlite3.Row
     return conn
 
+def lock_file(suffix, blocking=True):
+    """
+    Takes an exclusive cross-process lock on DATABASE_PATH + suffix and returns
+    the open lock file; the lock is held until it is closed. Returns None when
+    blocking=False and another process holds it.
+    """
+    handle = open(DATABASE_PATH + suffix, 'w')
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            return None
+    return handle
+
+@contextmanager
+def _init_lock():
+    """Serializes schema setup across processes (e.g. several gunicorn workers)."""
+    handle = lock_file('.lock')
+    try:
+        yield
+    finally:
+        handle.close()
+
+def _apply_migrations(conn):
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for number, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.executescript(script)
+        conn.execute(f"PRAGMA user_version = {number}")
+
 def init_database():
+    with _init_lock():
+        _init_database()
+
+def _init_database():
     conn = get_db_connection()
-    with open('schema.sql', 'r') as f:
+
+    is_new = conn.execute("SELECT name FROM sqlite_master WHERE name = 'patients'").fetchone() is None
+    if is_new:
+        # Must be set before anything is written to the file
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    # WAL lets readers in other worker processes proceed while one writes
+    conn.execute("PRAGMA journal_mode = WAL")
+
+    # Bring existing tables up to date first so schema.sql can index new columns
+    if is_new:
+        conn.execute(f"PRAGMA user_version = {len(MIGRATIONS)}")
+    else:
+        _apply_migrations(conn)
+
+    with open(SCHEMA_PATH, 'r') as f:
         conn.executescript(f.read())
     
     cursor = conn.cursor()
@@ -41,6 +111,13 @@ def get_patient_id():
     patient = conn.execute("SELECT id FROM patients LIMIT 1").fetchone()
     conn.close()
     return patient['id'] if patient else None
+
+def get_all_patient_ids():
+    conn = get_db_connection()
+    patients = conn.execute("SELECT id FROM patients").fetchall()
+    conn.close()
+    return [patient['id'] for patient in patients]
+
 def create_task(patient_id, task_name, scheduled_time):
     conn = get_db_connection()
     today = date.today().isoformat()
@@ -82,19 +159,70 @@ def mark_task_completed(patient_id, task_name):
     conn.commit()
     conn.close()
 
-def add_memory_note(patient_id, note_text, reminder_time=None):
+def add_memory_note(patient_id, note_text, reminder_time=None, vector_id=None):
     conn = get_db_connection()
     conn.execute(
-        "INSERT INTO memory_notes (patient_id, note_text, reminder_time) VALUES (?, ?, ?)",
-        (patient_id, note_text, reminder_time)
+        "INSERT INTO memory_notes (patient_id, note_text, reminder_time, vector_id) VALUES (?, ?, ?, ?)",
+        (patient_id, note_text, reminder_time, vector_id)
     )
     conn.commit()
     conn.close()
 
+def touch_memory_note(patient_id, vector_id, note_text, reminder_time=None):
+    """
+    Records a repeat of an existing note, keeping the newest wording.
+    Returns False if no row is linked to the vector.
+    """
+    conn = get_db_connection()
+    cursor = conn.execute(
+        """UPDATE memory_notes
+           SET note_text = ?,
+               seen_count = seen_count + 1,
+               last_seen_at = CURRENT_TIMESTAMP,
+               reminder_time = COALESCE(?, reminder_time)
+           WHERE patient_id = ? AND vector_id = ?""",
+        (note_text, reminder_time, patient_id, vector_id)
+    )
+    updated = cursor.rowcount > 0
+    conn.commit()
+    conn.close()
+    return updated
+
+def merge_memory_notes(merges):
+    """
+    Mirrors a vector compaction: rows linked to a removed vector are folded into
+    the row of the vector that was kept ({removed_id: kept_id}, oldest first).
+    The kept row takes the removed row's newer text, like the vector does.
+    """
+    if not merges:
+        return
+    conn = get_db_connection()
+    for removed_id, kept_id in merges.items():
+        kept = conn.execute("SELECT id FROM memory_notes WHERE vector_id = ? LIMIT 1", (kept_id,)).fetchone()
+        if not kept:
+            conn.execute("UPDATE memory_notes SET vector_id = ? WHERE vector_id = ?", (kept_id, removed_id))
+            continue
+        conn.execute(
+            """UPDATE memory_notes
+               SET note_text = COALESCE(
+                       (SELECT note_text FROM memory_notes WHERE vector_id = ?
+                        ORDER BY COALESCE(last_seen_at, created_at) DESC LIMIT 1),
+                       note_text),
+                   seen_count = seen_count + (SELECT COALESCE(SUM(seen_count), 0) FROM memory_notes WHERE vector_id = ?),
+                   last_seen_at = MAX(COALESCE(last_seen_at, created_at), COALESCE(
+                       (SELECT MAX(COALESCE(last_seen_at, created_at)) FROM memory_notes WHERE vector_id = ?),
+                       created_at))
+               WHERE id = ?""",
+            (removed_id, removed_id, removed_id, kept['id'])
+        )
+        conn.execute("DELETE FROM memory_notes WHERE vector_id = ?", (removed_id,))
+    conn.commit()
+    conn.close()
+
 def get_memory_notes(patient_id):
     conn = get_db_connection()
     notes = conn.execute(
-        "SELECT * FROM memory_notes WHERE patient_id = ? ORDER BY created_at DESC LIMIT 10",
+        "SELECT * FROM memory_notes WHERE patient_id = ? ORDER BY COALESCE(last_seen_at, created_at) DESC LIMIT 10",
         (patient_id,)
     ).fetchall()
     conn.close()
@@ -179,4 +307,135 @@ def delete_all_tasks(patient_id):
         (patient_id, today)
     )
     conn.commit()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+# ------------------------------------------------------------------
+# RETENTION / ARCHIVE
+# ------------------------------------------------------------------
+
+def _summarize_turns(turns, max_items=5):
+    """Short extractive summary: the first few distinct things the patient said."""
+    seen = []
+    for turn in turns:
+        message = turn['user_message'].strip()
+        if message and message.lower() not in (m.lower() for m in seen):
+            seen.append(message[:80])
+        if len(seen) == max_items:
+            break
+    return f"{len(turns)} turns. " + "; ".join(seen)
+
+def archive_conversations(older_than_days, keep_recent=10):
+    """
+    Moves conversation turns older than the cutoff into one compressed blob per
+    patient per month. The newest `keep_recent` turns per patient always stay hot.
+    Returns the number of turns archived.
+    """
+    conn = get_db_connection()
+    cutoff = f"-{int(older_than_days)} days"
+    candidates = """
+        FROM conversation_history
+        WHERE timestamp < datetime('now', ?)
+          AND id NOT IN (
+              SELECT id FROM conversation_history AS recent
+              WHERE recent.patient_id = conversation_history.patient_id
+              ORDER BY recent.timestamp DESC LIMIT ?
+          )
+    """
+    groups = conn.execute(
+        f"SELECT DISTINCT patient_id, strftime('%Y-%m', timestamp) AS month {candidates}",
+        (cutoff, keep_recent)
+    ).fetchall()
+
+    archived = 0
+    for group in groups:
+        patient_id, month = group['patient_id'], group['month']
+        # One transaction per patient-month keeps write locks short
+        with conn:
+            rows = conn.execute(
+                f"SELECT id, user_message, agent_response, timestamp {candidates}"
+                " AND patient_id = ? AND strftime('%Y-%m', timestamp) = ? ORDER BY timestamp",
+                (cutoff, keep_recent, patient_id, month)
+            ).fetchall()
+            if not rows:
+                continue
+
+            turns = [{k: row[k] for k in ('user_message', 'agent_response', 'timestamp')} for row in rows]
+            existing = conn.execute(
+                "SELECT payload FROM conversation_archive WHERE patient_id = ? AND month = ?",
+                (patient_id, month)
+            ).fetchone()
+            if existing:
+                turns = json.loads(zlib.decompress(existing['payload'])) + turns
+                turns.sort(key=lambda t: t['timestamp'])
+
+            payload = zlib.compress(json.dumps(turns).encode(), 9)
+            conn.execute(
+                """INSERT INTO conversation_archive
+                   (patient_id, month, turn_count, first_timestamp, last_timestamp, summary, payload)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (patient_id, month) DO UPDATE SET
+                       turn_count = excluded.turn_count,
+                       first_timestamp = excluded.first_timestamp,
+                       last_timestamp = excluded.last_timestamp,
+                       summary = excluded.summary,
+                       payload = excluded.payload,
+                       archived_at = CURRENT_TIMESTAMP""",
+                (patient_id, month, len(turns), turns[0]['timestamp'], turns[-1]['timestamp'],
+                 _summarize_turns(turns), payload)
+            )
+            conn.executemany(
+                "DELETE FROM conversation_history WHERE id = ?",
+                [(row['id'],) for row in rows]
+            )
+            archived += len(rows)
+
+    conn.close()
+    return archived
+
+def get_archive_summaries(patient_id):
+    conn = get_db_connection()
+    rows = conn.execute(
+        """SELECT month, turn_count, first_timestamp, last_timestamp, summary
+           FROM conversation_archive WHERE patient_id = ? ORDER BY month DESC""",
+        (patient_id,)
+    ).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+def get_archived_conversations(patient_id, month):
+    """Decompresses one archived month (YYYY-MM) on demand."""
+    conn = get_db_connection()
+    row = conn.execute(
+        "SELECT payload FROM conversation_archive WHERE patient_id = ? AND month = ?",
+        (patient_id, month)
+    ).fetchone()
+    conn.close()
+    return json.loads(zlib.decompress(row['payload'])) if row else []
+
+def prune_contact_calls(older_than_days):
+    """Deletes old call logs, keeping the latest call per patient for get_recent_caller."""
+    conn = get_db_connection()
+    cursor = conn.execute(
+        """DELETE FROM contact_calls
+           WHERE call_time < datetime('now', ?)
+             AND id NOT IN (
+                 SELECT id FROM contact_calls AS latest
+                 WHERE latest.patient_id = contact_calls.patient_id
+                 ORDER BY latest.call_time DESC LIMIT 1
+             )""",
+        (f"-{int(older_than_days)} days",)
+    )
+    deleted = cursor.rowcount
+    conn.commit()
+    conn.close()
+    return deleted
+
+def incremental_vacuum(max_pages):
+    """Releases up to `max_pages` free pages; returns how many are still free."""
+    conn = get_db_connection()
+    # executescript steps the pragma to completion; execute() frees only one page.
+    # The checkpoint folds the WAL back in so the freed space actually leaves the disk.
+    conn.executescript(f"PRAGMA incremental_vacuum({int(max_pages)}); PRAGMA wal_checkpoint(TRUNCATE);")
+    remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    conn.close()
+    return remaining
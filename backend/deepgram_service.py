@@ -5,34 +5,39 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DEEPGRAM_API_KEY = os.getenv('DEEPGRAM_API_KEY')
+DEEPGRAM_URL = os.getenv('DEEPGRAM_URL', "https://api.deepgram.com/v1/listen")
 
-def transcribe_audio(audio_data):
+def request_transcript(audio_data, content_type="audio/webm", timeout=30):
+    """
+    Sends raw bytes or a file-like object (streamed) to Deepgram.
+    Raises on network/API errors; returns "" when no speech was recognized.
+    """
+    url = f"{DEEPGRAM_URL}?model=nova-2&punctuate=true&language=en"
+    
+    headers = {
+        "Authorization": f"Token {DEEPGRAM_API_KEY}",
+        "Content-Type": content_type
+    }
+    
+    # Switched to synchronous requests
+    response = requests.post(url, headers=headers, data=audio_data, timeout=timeout)
+    
+    if response.status_code != 200:
+        # HTTPError keeps the response, so callers can tell a rejected request from an outage
+        raise requests.HTTPError(f"Deepgram returned {response.status_code}: {response.text}", response=response)
+    
+    result = response.json()
+    
+    # Safety check for nested keys
+    if 'results' in result and 'channels' in result['results']:
+        transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
+        return (transcript or "").strip()
+    return ""
+
+def transcribe_audio(audio_data, content_type="audio/webm"):
     try:
-        url = "https://api.deepgram.com/v1/listen?model=nova-2&punctuate=true&language=en"
-        
-        headers = {
-            "Authorization": f"Token {DEEPGRAM_API_KEY}",
-            "Content-Type": "audio/webm"
-        }
-        
-        # Switched to synchronous requests
-        response = requests.post(url, headers=headers, data=audio_data, timeout=30)
-        
-        if response.status_code != 200:
-            print(f"Deepgram Error Details: {response.text}")
-            return None
-        
-        result = response.json()
-        
-        # Safety check for nested keys
-        if 'results' in result and 'channels' in result['results']:
-            transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
-            
-            if not transcript or transcript.strip() == "":
-                return None
-            return transcript  
-        return None
+        return request_transcript(audio_data, content_type) or None
     
     except Exception as e:
         print(f"Deepgram error: {str(e)}")
-        return None
\ No newline at end of file
+        return None
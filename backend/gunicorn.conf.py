@@ -0,0 +1,34 @@
+import gc
+import os
+import multiprocessing
+
+# Run from backend/:  gunicorn -c gunicorn.conf.py
+chdir = os.path.dirname(os.path.abspath(__file__))
+wsgi_app = os.getenv('WSGI_APP', 'wsgi:app')
+bind = os.getenv('BIND', '0.0.0.0:5000')
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+
+# Import the app (and the embedding model) once in the master, then fork
+preload_app = True
+
+# A chat turn can wait on Deepgram, Gemini and Murf in sequence
+timeout = 90
+# Time in-flight requests get to finish after SIGTERM. The listeners close at once,
+# so behind a load balancer stop routing first (e.g. a Kubernetes preStop sleep).
+graceful_timeout = int(os.getenv('GRACEFUL_TIMEOUT', 30))
+
+
+def when_ready(server):
+    # Move everything loaded so far out of the GC's reach, so collections in
+    # the workers don't write to (and un-share) the preloaded pages
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    import app
+    app.worker_ready()
+
+
+def worker_exit(server, worker):
+    import retention_service
+    retention_service.stop_retention_worker()
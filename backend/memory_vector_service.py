@@ -2,32 +2,88 @@ import chromadb
 from chromadb.utils import embedding_functions
 import os
 import hashlib
+import numpy as np
 
 # Initialize ChromaDB (Local persistence)
-CHROMA_DATA_PATH = os.path.join(os.path.dirname(__file__), 'chroma_db')
-client = chromadb.PersistentClient(path=CHROMA_DATA_PATH)
+CHROMA_DATA_PATH = os.getenv('CHROMA_DATA_PATH', os.path.join(os.path.dirname(__file__), 'chroma_db'))
 
+# The embedding model is loaded at import so a pre-forking server (gunicorn --preload)
+# loads it once and shares the weights with every worker copy-on-write.
 ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
 
-collection = client.get_or_create_collection(name="patient_memories", embedding_function=ef)
+# The Chroma client holds SQLite connections, which must not cross a fork,
+# so each process opens its own on first use.
+_collection = None
+_collection_pid = None
 
-def save_vector_memory(note_text, metadata):
+def _get_collection():
+    global _collection, _collection_pid
+    if _collection is None or _collection_pid != os.getpid():
+        client = chromadb.PersistentClient(path=CHROMA_DATA_PATH)
+        _collection = client.get_or_create_collection(name="patient_memories", embedding_function=ef)
+        _collection_pid = os.getpid()
+    return _collection
+
+def warm_up():
+    """Runs one embedding and opens the store so the first real request isn't slow."""
+    ef(["warm up"])
+    _get_collection()
+
+# Cosine similarity above which two notes are treated as the same memory. Merging
+# replaces the stored text, so the default only catches near-verbatim repeats:
+# distinct facts with similar wording ("my son's number is ..." / "my daughter's
+# number is ...") must never merge. Lower it only after running
+# benchmarks/bench_vector_dedup.py against the real embedding model.
+DUPLICATE_SIMILARITY = float(os.getenv('MEMORY_DUPLICATE_SIMILARITY', 0.97))
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / (np.linalg.norm(vectors, axis=-1, keepdims=True) + 1e-12)
+
+def save_vector_memory(note_text, metadata, threshold=DUPLICATE_SIMILARITY):
     """
-    Saves the note text + metadata (date, context) as a vector.
+    Saves the note text + metadata (date, context) as a vector. If the patient
+    already has a note above the similarity threshold, that vector is updated
+    in place instead of adding a new one. The new text replaces the old one, so
+    a repeat that made it past the threshold keeps its latest wording.
+    Returns (doc_id, merged).
     """
-    doc_id = hashlib.sha256(note_text.encode()).hexdigest()
-    
-    collection.add(
+    collection = _get_collection()
+    embedding = ef([note_text])[0]
+
+    nearest = collection.query(
+        query_embeddings=[embedding],
+        n_results=1,
+        where={"patient_id": metadata["patient_id"]},
+        include=["metadatas", "embeddings"]
+    )
+    if nearest['ids'][0]:
+        similarity = float(_normalize(nearest['embeddings'][0][0]) @ _normalize(embedding))
+        if similarity >= threshold:
+            doc_id = nearest['ids'][0][0]
+            collection.update(
+                ids=[doc_id],
+                documents=[note_text],
+                embeddings=[embedding],
+                metadatas=[_merge_metadata(nearest['metadatas'][0][0], metadata)]
+            )
+            return doc_id, True
+
+    # Reuse the embedding computed above rather than letting Chroma embed again
+    doc_id = hashlib.sha256(f"{metadata['patient_id']}:{note_text}".encode()).hexdigest()
+    collection.upsert(
         documents=[note_text],
+        embeddings=[embedding],
         metadatas=[metadata],
         ids=[doc_id]
     )
+    return doc_id, False
 
 def search_similar_memories(query_text, n_results=2):
     """
     Returns the most relevant notes based on meaning.
     """
-    results = collection.query(
+    results = _get_collection().query(
         query_texts=[query_text],
         n_results=n_results
     )
@@ -44,10 +100,76 @@ def delete_patient_memories(patient_id):
     """
     try:
         # Delete entries where metadata matches patient_id
-        collection.delete(
+        _get_collection().delete(
             where={"patient_id": patient_id}
         )
         return True
     except Exception as e:
         print(f"Vector delete error: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def _merge_metadata(kept, duplicate):
+    """
+    Folds a newer duplicate's metadata into the note we keep: every date it
+    was mentioned, how many times, and when it was last seen. `date` follows
+    the newest mention, matching the newest text.
+    """
+    merged = dict(kept)
+    dates = set()
+    for meta in (kept, duplicate):
+        dates.update(d for d in (meta.get('dates_seen') or meta.get('date', '')[:10]).split(',') if d)
+
+    merged['dates_seen'] = ",".join(sorted(dates))
+    merged['seen_count'] = kept.get('seen_count', 1) + duplicate.get('seen_count', 1)
+    merged['last_seen'] = max(
+        kept.get('last_seen', kept.get('date', '')),
+        duplicate.get('last_seen', duplicate.get('date', ''))
+    )
+    merged['date'] = merged['last_seen']
+    return merged
+
+def compact_patient_memories(patient_id, threshold=DUPLICATE_SIMILARITY):
+    """
+    Merges near-duplicate vectors for a patient. Notes are visited oldest
+    first, so each group keeps its first id but takes the newest text, as
+    save_vector_memory does. Returns {removed_id: kept_id}, in date order,
+    so memory_notes can be merged to match.
+    """
+    collection = _get_collection()
+    records = collection.get(where={"patient_id": patient_id}, include=["documents", "metadatas", "embeddings"])
+    if len(records['ids']) < 2:
+        return {}
+
+    order = sorted(range(len(records['ids'])), key=lambda i: records['metadatas'][i].get('date', ''))
+    vectors = _normalize(records['embeddings'])
+
+    kept = []  # indexes into records
+    metadata = {}
+    newest = {}  # kept index -> index whose text and embedding it now carries
+    duplicates = {}
+    for i in order:
+        if kept:
+            # Compare against the text each group currently holds
+            similarities = vectors[[newest[k] for k in kept]] @ vectors[i]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                target = kept[best]
+                metadata[target] = _merge_metadata(metadata[target], records['metadatas'][i])
+                newest[target] = i
+                duplicates[records['ids'][i]] = records['ids'][target]
+                continue
+        kept.append(i)
+        metadata[i] = records['metadatas'][i]
+        newest[i] = i
+
+    if duplicates:
+        changed = [i for i in kept if newest[i] != i]
+        collection.update(
+            ids=[records['ids'][i] for i in changed],
+            documents=[records['documents'][newest[i]] for i in changed],
+            embeddings=[records['embeddings'][newest[i]] for i in changed],
+            metadatas=[metadata[i] for i in changed]
+        )
+        collection.delete(ids=list(duplicates))
+
+    return duplicates
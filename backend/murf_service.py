@@ -5,9 +5,10 @@ from dotenv import load_dotenv
 load_dotenv()
 
 MURF_API_KEY = os.getenv('MURF_API_KEY')
+MURF_URL = os.getenv('MURF_URL', "https://api.murf.ai/v1/speech/generate-with-key")
 
-def generate_speech(text):
-    url = "https://api.murf.ai/v1/speech/generate-with-key"
+def generate_speech(text, timeout=30):
+    url = MURF_URL
     
     headers = {
         "Content-Type": "application/json",
@@ -31,7 +32,7 @@ def generate_speech(text):
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = requests.post(url, json=payload, headers=headers, timeout=timeout)
         response.raise_for_status()
         
         result = response.json()
@@ -41,6 +42,9 @@ def generate_speech(text):
         
         raise Exception("No audio data in Murf response")
     
+    except requests.HTTPError as e:
+        print(f"Murf API error: {str(e)}")
+        raise
     except Exception as e:
         print(f"Murf API error: {str(e)}")
         # Return empty string or handle gracefully in frontend
@@ -0,0 +1,86 @@
+import os
+import logging
+import threading
+from dotenv import load_dotenv
+
+import database as db
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Retention policies (days). Turns past the cutoff move to the monthly archive.
+CONVERSATION_RETENTION_DAYS = int(os.getenv('CONVERSATION_RETENTION_DAYS', 30))
+CONTACT_CALL_RETENTION_DAYS = int(os.getenv('CONTACT_CALL_RETENTION_DAYS', 365))
+# Turns per patient that are never archived, so the UI history is never empty
+HOT_TURNS_TO_KEEP = int(os.getenv('HOT_TURNS_TO_KEEP', 10))
+# Pages released per cycle; keeps each vacuum step short
+VACUUM_PAGES_PER_CYCLE = int(os.getenv('VACUUM_PAGES_PER_CYCLE', 2000))
+# Off until MEMORY_DUPLICATE_SIMILARITY has been measured on the real embedding model
+# (benchmarks/bench_vector_dedup.py): a merge rewrites notes across the whole store
+VECTOR_COMPACTION_ENABLED = os.getenv('VECTOR_COMPACTION_ENABLED', '0') == '1'
+RETENTION_INTERVAL_HOURS = float(os.getenv('RETENTION_INTERVAL_HOURS', 24))
+
+_stop_event = threading.Event()
+_worker = None
+_leader_lock = None
+
+
+def run_retention_cycle():
+    """
+    Runs every retention policy once and returns a dict of what changed.
+    """
+    stats = {
+        'archived_turns': db.archive_conversations(CONVERSATION_RETENTION_DAYS, keep_recent=HOT_TURNS_TO_KEEP),
+        'pruned_calls': db.prune_contact_calls(CONTACT_CALL_RETENTION_DAYS),
+        'merged_vectors': 0
+    }
+
+    if VECTOR_COMPACTION_ENABLED:
+        # Imported lazily: loading Chroma and the embedding model is expensive
+        import memory_vector_service
+        for patient_id in db.get_all_patient_ids():
+            merges = memory_vector_service.compact_patient_memories(patient_id)
+            db.merge_memory_notes(merges)
+            stats['merged_vectors'] += len(merges)
+
+    stats['free_pages'] = db.incremental_vacuum(VACUUM_PAGES_PER_CYCLE)
+    return stats
+
+
+def _become_leader():
+    """
+    With several server processes only one should run retention. The first to
+    grab the lock keeps it until it exits; the others keep checking.
+    """
+    global _leader_lock
+    if _leader_lock is None:
+        _leader_lock = db.lock_file('.retention.lock', blocking=False)
+    return _leader_lock is not None
+
+
+def _retention_loop():
+    while not _stop_event.is_set():
+        if not _become_leader():
+            _stop_event.wait(60)
+            continue
+        try:
+            stats = run_retention_cycle()
+            logger.info(f"Retention cycle: {stats}")
+        except Exception as e:
+            logger.error(f"Retention cycle failed: {str(e)}")
+        _stop_event.wait(RETENTION_INTERVAL_HOURS * 3600)
+
+
+def start_retention_worker():
+    """Starts the background retention thread (once per process)."""
+    global _worker
+    if _worker and _worker.is_alive():
+        return
+    _stop_event.clear()
+    _worker = threading.Thread(target=_retention_loop, name='retention', daemon=True)
+    _worker.start()
+
+
+def stop_retention_worker():
+    _stop_event.set()
@@ -22,6 +22,9 @@ CREATE TABLE IF NOT EXISTS memory_notes (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     reminder_time TEXT,
     is_reminded BOOLEAN DEFAULT 0,
+    vector_id TEXT,
+    seen_count INTEGER DEFAULT 1,
+    last_seen_at TIMESTAMP,
     FOREIGN KEY (patient_id) REFERENCES patients(id)
 );
 
@@ -41,3 +44,21 @@ CREATE TABLE IF NOT EXISTS contact_calls (
     call_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (patient_id) REFERENCES patients(id)
 );
+
+CREATE TABLE IF NOT EXISTS conversation_archive (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    patient_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    turn_count INTEGER NOT NULL,
+    first_timestamp TIMESTAMP,
+    last_timestamp TIMESTAMP,
+    summary TEXT,
+    payload BLOB NOT NULL,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (patient_id, month),
+    FOREIGN KEY (patient_id) REFERENCES patients(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_memory_notes_vector_id ON memory_notes (vector_id);
+CREATE INDEX IF NOT EXISTS idx_conversation_history_patient_time ON conversation_history (patient_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_contact_calls_patient_time ON contact_calls (patient_id, call_time);
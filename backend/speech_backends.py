@@ -0,0 +1,238 @@
+import io
+import os
+import json
+import time
+import base64
+import shutil
+import threading
+import subprocess
+import requests
+from dotenv import load_dotenv
+
+import audio_service
+import murf_service
+import deepgram_service
+
+try:
+    import vosk
+except ImportError:  # optional: offline speech-to-text
+    vosk = None
+
+load_dotenv()
+
+# Skip the cloud services entirely (no network)
+SPEECH_OFFLINE = os.getenv('SPEECH_OFFLINE', '0') == '1'
+# How long a remote backend may take before we fall back to the local one
+TTS_LATENCY_BUDGET = float(os.getenv('TTS_LATENCY_BUDGET', 6))
+STT_LATENCY_BUDGET = float(os.getenv('STT_LATENCY_BUDGET', 8))
+LOCAL_TIMEOUT = float(os.getenv('LOCAL_SPEECH_TIMEOUT', 15))
+# A failing backend is skipped for this long, doubling on repeated failures
+FAILURE_COOLDOWN = 30
+MAX_FAILURE_COOLDOWN = 600
+
+VOSK_MODEL_PATH = os.getenv('VOSK_MODEL_PATH')
+ESPEAK_PATH = shutil.which('espeak-ng') or shutil.which('espeak')
+
+
+class SpeechRequestError(Exception):
+    """
+    A service rejected this particular request (HTTP 4xx, e.g. audio it can't
+    decode). The service itself is up, so this never starts a cooldown.
+    """
+
+
+def _call_remote(function, *args, **kwargs):
+    """Calls a cloud service, turning client errors into SpeechRequestError."""
+    try:
+        return function(*args, **kwargs)
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        # 429 is the service asking us to back off, so it stays a failure
+        if status is not None and 400 <= status < 500 and status != 429:
+            raise SpeechRequestError(str(e)) from e
+        raise
+
+
+class SpeechBackend:
+    """
+    One TTS or STT engine. Tracks its own health so a failing service is
+    skipped for a while instead of costing every request a timeout.
+    """
+    name = 'backend'
+    remote = False
+
+    def __init__(self):
+        self.failures = 0
+        self.skip_until = 0
+
+    def available(self):
+        return True
+
+    def healthy(self):
+        return time.monotonic() >= self.skip_until
+
+    def record_success(self):
+        self.failures = 0
+        self.skip_until = 0
+
+    def record_failure(self):
+        self.failures += 1
+        cooldown = min(FAILURE_COOLDOWN * 2 ** (self.failures - 1), MAX_FAILURE_COOLDOWN)
+        self.skip_until = time.monotonic() + cooldown
+
+
+# ------------------------------------------------------------------
+# TEXT-TO-SPEECH
+# ------------------------------------------------------------------
+
+class MurfTTS(SpeechBackend):
+    name = 'murf'
+    remote = True
+
+    def synthesize(self, text, timeout):
+        return _call_remote(murf_service.generate_speech, text, timeout=timeout), 'audio/mpeg'
+
+
+class EspeakTTS(SpeechBackend):
+    """Offline, CPU-only fallback voice via the espeak-ng command line tool."""
+    name = 'espeak'
+
+    def available(self):
+        return ESPEAK_PATH is not None
+
+    def synthesize(self, text, timeout):
+        # A slightly slower rate than espeak's default is easier to follow
+        result = subprocess.run(
+            [ESPEAK_PATH, '-v', 'en-us', '-s', '140', '--stdout', text],
+            capture_output=True, timeout=timeout, check=True
+        )
+        return base64.b64encode(result.stdout).decode(), 'audio/wav'
+
+
+# ------------------------------------------------------------------
+# SPEECH-TO-TEXT
+# ------------------------------------------------------------------
+
+class DeepgramSTT(SpeechBackend):
+    name = 'deepgram'
+    remote = True
+
+    def transcribe(self, audio, content_type, timeout):
+        return _call_remote(deepgram_service.request_transcript, audio, content_type, timeout=timeout)
+
+
+class VoskSTT(SpeechBackend):
+    """Offline, CPU-only fallback recognizer (pip install vosk, set VOSK_MODEL_PATH)."""
+    name = 'vosk'
+
+    def __init__(self):
+        super().__init__()
+        self._model = None
+        self._model_lock = threading.Lock()
+
+    def available(self):
+        return (vosk is not None and audio_service.FFMPEG_PATH is not None
+                and bool(VOSK_MODEL_PATH) and os.path.isdir(VOSK_MODEL_PATH))
+
+    def load_model(self):
+        # Loading takes seconds, so concurrent first requests must not each load a copy
+        with self._model_lock:
+            if self._model is None:
+                self._model = vosk.Model(VOSK_MODEL_PATH)
+        return self._model
+
+    def transcribe(self, audio, content_type, timeout):
+        pcm = audio_service.decode_to_pcm(audio, timeout=timeout)
+        recognizer = vosk.KaldiRecognizer(self.load_model(), audio_service.TARGET_SAMPLE_RATE)
+        recognizer.AcceptWaveform(pcm)
+        return json.loads(recognizer.FinalResult()).get('text', '').strip()
+
+
+# Tried in order; remote first, local fallback second
+TTS_BACKENDS = [MurfTTS(), EspeakTTS()]
+STT_BACKENDS = [DeepgramSTT(), VoskSTT()]
+
+
+def warm_up():
+    """
+    Loads the local recognizer's model up front, so no request pays for it.
+    Call it before forking so the workers share one copy.
+    """
+    for backend in STT_BACKENDS:
+        if isinstance(backend, VoskSTT) and backend.available():
+            backend.load_model()
+
+
+def _run_chain(backends, budget, call):
+    """
+    Calls each usable backend in turn until one succeeds. Remote backends share
+    the latency budget as their timeout; local ones get LOCAL_TIMEOUT.
+    Returns (result, backend_name), or (None, None) if every backend failed.
+    """
+    deadline = time.monotonic() + budget
+    for backend in backends:
+        if backend.remote and SPEECH_OFFLINE:
+            continue
+        if not backend.available() or not backend.healthy():
+            continue
+
+        if backend.remote:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                continue
+        else:
+            timeout = LOCAL_TIMEOUT
+
+        try:
+            result = call(backend, timeout)
+        except SpeechRequestError as e:
+            # Only this input was rejected: try the next backend, keep this one in rotation
+            print(f"{backend.name} rejected the request: {str(e)}")
+            continue
+        except Exception as e:
+            print(f"{backend.name} speech backend error: {str(e)}")
+            backend.record_failure()
+            continue
+
+        backend.record_success()
+        return result, backend.name
+
+    return None, None
+
+
+def synthesize(text):
+    """
+    Returns (audio_base64, mime_type), or (None, None) when no voice is
+    available and the reply should be shown as text only.
+    """
+    result, _ = _run_chain(TTS_BACKENDS, TTS_LATENCY_BUDGET,
+                           lambda backend, timeout: backend.synthesize(text, timeout))
+    return result or (None, None)
+
+
+def transcribe(audio, content_type='audio/webm'):
+    """
+    Returns the transcript, or None if nothing was recognized or every
+    backend failed.
+    """
+    if isinstance(audio, bytes):
+        audio = io.BytesIO(audio)
+
+    def call(backend, timeout):
+        # An earlier backend may have consumed part of the stream
+        audio.seek(0)
+        return backend.transcribe(audio, content_type, timeout)
+
+    transcript, _ = _run_chain(STT_BACKENDS, STT_LATENCY_BUDGET, call)
+    return transcript or None
+
+
+def backend_status():
+    """Health snapshot for /readyz."""
+    return {
+        backend.name: {
+            'available': backend.available() and not (backend.remote and SPEECH_OFFLINE),
+            'healthy': backend.healthy()
+        }
+        for backend in TTS_BACKENDS + STT_BACKENDS
+    }
@@ -0,0 +1,4 @@
+from app import create_app
+
+# Loaded once in the gunicorn master (preload_app); workers inherit it on fork
+app = create_app(preload=True)
@@ -140,9 +140,9 @@ async function sendAudioToServer(audioBlob) {
         displayMessage(data.response, 'agent');
         
         if (data.audio) {
-            await playAudioResponse(data.audio);
+            await playAudioResponse(data.audio, data.audio_format);
         } else {
-            console.error('No audio in response');
+            console.info('Text-only reply (no voice available)');
             statusDiv.textContent = 'Hold microphone to speak';
         }
         
@@ -186,10 +186,10 @@ function displayMessage(text, type) {
     });
 }
 
-async function playAudioResponse(audioBase64) {
+async function playAudioResponse(audioBase64, audioFormat = 'audio/mpeg') {
     return new Promise((resolve, reject) => {
         try {
-            const audioBlob = base64ToBlob(audioBase64, 'audio/mpeg');
+            const audioBlob = base64ToBlob(audioBase64, audioFormat || 'audio/mpeg');
             const audioUrl = URL.createObjectURL(audioBlob);
             const audio = new Audio(audioUrl);
             
@@ -396,7 +396,7 @@ async function sendTextMessage() {
         displayMessage(data.response, 'agent');
 
         if (data.audio) {
-            await playAudioResponse(data.audio);
+            await playAudioResponse(data.audio, data.audio_format);
         } else {
             statusDiv.textContent = 'Hold microphone to speak';
         }